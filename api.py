@@ -1,5 +1,7 @@
 import asyncio
+import os
 import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException
@@ -19,6 +21,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Threads serving to_thread work on the query path (Pinecone lookups);
+# ingestion runs in the process pool, so it can't occupy these slots.
+QUERY_THREADS = 32
+
+
+@app.on_event("startup")
+async def limit_worker_threads():
+    """Size the threadpool that backs asyncio.to_thread.
+
+    asyncio.to_thread runs on the event loop's default executor (not
+    anyio's limiter), so install one with an explicit bound. /ingest is
+    isolated in the process pool, so this pool only ever runs short
+    I/O-bound query work; capping it means a burst of slow Pinecone
+    calls queues instead of spawning unbounded threads.
+    """
+    app.state.query_executor = ThreadPoolExecutor(max_workers=QUERY_THREADS)
+    asyncio.get_running_loop().set_default_executor(app.state.query_executor)
+
+
+@app.on_event("startup")
+async def create_process_pool():
+    """Process pool for CPU-bound ingestion work.
+
+    Running repo_processor in a thread would serialize concurrent /ingest
+    requests on the GIL; a shared process pool lets them use real cores.
+    """
+    app.state.procpool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+@app.on_event("shutdown")
+async def shutdown_process_pool():
+    app.state.procpool.shutdown(wait=False)
+    app.state.query_executor.shutdown(wait=False)
+
+
 # ========== Request/Response Models ==========
 class IngestRequest(BaseModel):
     repo_url: str
@@ -46,8 +83,10 @@ async def ingest_repository(request: IngestRequest):
     try:
         print(f"\n[API] /ingest endpoint called with: {request.repo_url}")
         
-        # Run blocking code in a thread to avoid blocking the event loop
-        repo_id = await asyncio.to_thread(repo_processor, request.repo_url)
+        # Ingestion is CPU-bound (parsing); run it in the process pool so
+        # concurrent ingests scale with cores instead of fighting the GIL.
+        loop = asyncio.get_running_loop()
+        repo_id = await loop.run_in_executor(app.state.procpool, repo_processor, request.repo_url)
         
         if repo_id is None:
             raise HTTPException(status_code=500, detail="Repository processing failed")
@@ -65,7 +104,8 @@ async def query_repository(request: QueryRequest):
     try:
         print(f"\n[API] /query endpoint called")
         
-        answer = await asyncio.to_thread(query_processor, request.query, request.repo_id, request.top_k)
+        # query_processor is async end-to-end; await it on the event loop.
+        answer = await query_processor(request.query, request.repo_id, request.top_k)
         
         if answer is None:
             raise HTTPException(status_code=500, detail="Query processing failed")
@@ -94,11 +134,20 @@ async def root():
 
 
 if __name__ == "__main__":
+    import logging
     import uvicorn
+    # One-time logging config for the knowthecode.* loggers; modules log
+    # through logging.getLogger so debug noise is free unless enabled here.
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     print("Starting KnowTheCode API...")
+    # app must be passed as an import string for workers > 1; uvloop and
+    # httptools ship with uvicorn[standard] and speed up the event loop.
     uvicorn.run(
-        app,
+        "api:app",
         host="0.0.0.0",
         port=8000,
+        workers=max(2, os.cpu_count() or 1),
+        loop="uvloop",
+        http="httptools",
         reload=False,
     )
\ No newline at end of file
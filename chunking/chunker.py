@@ -4,14 +4,51 @@ import sys
 import json
 import hashlib
 import bisect
-from typing import List, Dict, Optional
+import re
+import threading
 
-# Optional import: tree_sitter may not be installed or languages not built.
+# Optional accelerators: ijson streams huge JSON inputs without building
+# the whole list; orjson serializes a few times faster than stdlib json.
+try:
+    import ijson
+except Exception:
+    ijson = None
 try:
-    from tree_sitter import Language, Parser
-    TREE_SITTER_AVAILABLE = True
+    import orjson
 except Exception:
-    TREE_SITTER_AVAILABLE = False
+    orjson = None
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import List, Dict, Optional
+
+# tree_sitter and the language wheels are imported lazily on first use so
+# importing this module (and API cold start) doesn't pay for parsers that
+# may never be needed. _ensure_tree_sitter() fills these in.
+Language = None
+Parser = None
+Query = None
+QueryCursor = None
+_TS_STATE: Optional[bool] = None
+
+def _ensure_tree_sitter() -> bool:
+    """Import the tree_sitter binding on first use; False if unavailable."""
+    global _TS_STATE, Language, Parser, Query, QueryCursor
+    if _TS_STATE is None:
+        try:
+            from tree_sitter import Language as _Language, Parser as _Parser, Query as _Query
+            Language, Parser, Query = _Language, _Parser, _Query
+            # QueryCursor only exists on newer bindings (v0.25+); older
+            # ones run captures off the Query object itself.
+            try:
+                from tree_sitter import QueryCursor as _QueryCursor
+                QueryCursor = _QueryCursor
+            except Exception:
+                QueryCursor = None
+            _TS_STATE = True
+        except Exception:
+            _TS_STATE = False
+            print("DEBUG: tree_sitter Python binding NOT available; using fallback chunkers only.")
+    return _TS_STATE
 
 # -------- CONFIG --------
 # Languages we plan to support (adjust as you add grammars)
@@ -38,34 +75,89 @@ EXT_LANG = {
     '.ipynb': 'ipynb'  # Jupyter notebooks
 }
 
+def _json_loads(s):
+    return orjson.loads(s) if orjson is not None else json.loads(s)
+
+def _json_dumps_indented(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+# markdown heading at start of line, allowing indentation; compiled once so
+# the per-line check runs in the re engine instead of strip()+startswith()
+HEADING_RE = re.compile(r'[ \t]*#')
+
 # -------- utilities --------
 def detect_lang_from_path(path: str) -> Optional[str]:
-    _, ext = os.path.splitext(path.lower())
-    return EXT_LANG.get(ext)
-
-def compute_line_starts(text: str):
-    # returns list of byte offsets for each line start (0-indexed)
-    line_starts = []
-    pos = 0
-    for line in text.splitlines(True):
-        line_starts.append(pos)
-        pos += len(line.encode('utf8'))
+    # rpartition avoids lowercasing the whole path just to read the extension
+    _, sep, ext = path.rpartition('.')
+    if not sep:
+        return None
+    return EXT_LANG.get('.' + ext.lower())
+
+def compute_line_starts(data) -> List[int]:
+    # returns list of byte offsets for each line start (0-indexed); takes
+    # the UTF-8 bytes directly so nothing gets re-encoded line by line
+    if isinstance(data, str):
+        data = data.encode('utf8')
+    if not data:
+        return []
+    line_starts = [0]
+    pos = data.find(b'\n')
+    while pos != -1:
+        if pos + 1 < len(data):
+            line_starts.append(pos + 1)
+        pos = data.find(b'\n', pos + 1)
     return line_starts
 
+def split_content_lines(content: str) -> List[str]:
+    """Split content on newlines only, one entry per line_starts slot.
+
+    str.splitlines also breaks on \f, \v, \x85, \u2028 and friends,
+    which compute_line_starts and Tree-sitter's row model do not — one
+    form feed and every later line index pointed at the wrong text.
+    Splitting on '\n' (and dropping the trailing empty element a final
+    newline produces) keeps len(lines) == len(line_starts) always.
+    """
+    lines = content.split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+    return lines
+
 def byte_to_line(byte_offset: int, line_starts: List[int]) -> int:
     idx = bisect.bisect_right(line_starts, byte_offset) - 1
     return max(0, idx)
 
-def slice_lines(text: str, start_line: int, end_line: int) -> str:
-    lines = text.splitlines()
+def slice_lines(lines: List[str], start_line: int, end_line: int) -> str:
+    # takes the pre-split line list so callers don't re-split per node
     start_line = max(0, start_line)
     end_line = min(len(lines) - 1, end_line)
     if start_line > end_line:
         return ''
     return '\n'.join(lines[start_line:end_line+1]) + '\n'
 
+def split_line_blocks(lines: List[str]):
+    """Yield (start, end) line-index blocks of roughly MAX_CHARS each.
+
+    Uses cumulative char offsets + bisect so finding each block boundary is
+    O(log n) instead of re-joining the block to measure it (which made the
+    old splitter O(n^2) on big generated files). Blocks overlap by
+    OVERLAP_LINES like before.
+    """
+    cum = [0]
+    for ln in lines:
+        cum.append(cum[-1] + len(ln) + 1)
+    n = len(lines)
+    i = 0
+    while i < n:
+        j = min(n, bisect.bisect_left(cum, cum[i] + MAX_CHARS, i + 1))
+        yield i, j
+        i = j - OVERLAP_LINES if (j - OVERLAP_LINES) > i else j
+
 def make_id(path: str, start_line: int, end_line: int, snippet: Optional[str] = None) -> str:
-    h = hashlib.sha256()
+    # chunk IDs are content-addressed keys, not security material; blake2b
+    # is much faster than sha256 and 32 hex chars is plenty of ID space
+    h = hashlib.blake2b(digest_size=16)
     h.update(path.encode('utf8'))
     h.update(b'\x00')
     h.update(str(start_line).encode())
@@ -77,7 +169,25 @@ def make_id(path: str, start_line: int, end_line: int, snippet: Optional[str] =
     return h.hexdigest()
 
 # -------- Tree-sitter setup (v0.20+ with pre-compiled wheels) --------
-PARSER_BY_LANG: Dict[str, Parser] = {}
+# Language objects are cheap to share, but Parser objects are NOT thread-safe.
+# Languages load lazily on first request for that language (see
+# _load_language) and parsers are built per worker thread (FastAPI runs
+# ingestion via asyncio.to_thread, so several threads can chunk at once).
+LANG_CAPSULE_BY_LANG: Dict[str, "Language"] = {}
+
+# Node-selection queries compiled once per language so matching runs inside
+# the C library instead of a Python-level recursive walk (see
+# select_nodes_for_lang). Same node types as the old `wanted` sets.
+QUERY_SOURCE_BY_LANG = {
+    'python': "(module) @node (function_definition) @node (class_definition) @node",
+    'javascript': ("(program) @node (function_declaration) @node (class_declaration) @node "
+                   "(method_definition) @node (lexical_declaration) @node (export_statement) @node"),
+    'typescript': ("(program) @node (function_declaration) @node (class_declaration) @node "
+                   "(method_definition) @node (lexical_declaration) @node (export_statement) @node"),
+    'java': "(program) @node (class_declaration) @node (method_declaration) @node",
+}
+
+QUERY_BY_LANG: Dict[str, "Query"] = {}
 
 # Map language keys to their pre-compiled wheel module names
 LANG_MODULES = {
@@ -89,6 +199,70 @@ LANG_MODULES = {
     'css':('tree_sitter_css','css')
 }
 
+# Languages we can attempt to AST-chunk (wheel may still be missing).
+SUPPORTED_LANGS = frozenset(LANG_MODULES)
+
+_TLS = threading.local()
+_LANG_LOCK = threading.Lock()
+_LANG_FAILED = set()
+
+def _load_language(lang: str) -> Optional["Language"]:
+    """Lazily import the wheel for lang and wrap it in a Language.
+
+    First call per language does the __import__ and compiles its
+    node-selection query; failures are remembered so a missing wheel
+    costs one attempt, not one per file.
+    """
+    language = LANG_CAPSULE_BY_LANG.get(lang)
+    if language is not None:
+        return language
+    if lang in _LANG_FAILED or lang not in SUPPORTED_LANGS:
+        return None
+    if not _ensure_tree_sitter():
+        return None
+    with _LANG_LOCK:
+        language = LANG_CAPSULE_BY_LANG.get(lang)
+        if language is not None:
+            return language
+        if lang in _LANG_FAILED:
+            return None
+        module_name, _display_name = LANG_MODULES[lang]
+        try:
+            lang_capsule = get_language_object(module_name, lang)
+            # Wrap capsule in Language object (v0.25 takes only 1 arg)
+            language = Language(lang_capsule)
+            print(f"DEBUG: loaded language for {lang} from {module_name}")
+        except ImportError as e:
+            print(f"DEBUG: {module_name} not installed for {lang}: {e}")
+            _LANG_FAILED.add(lang)
+            return None
+        except Exception as e:
+            print(f"DEBUG: failed to load language for {lang}: {e}")
+            _LANG_FAILED.add(lang)
+            return None
+        # Compile the node-selection query once per language.
+        query_src = QUERY_SOURCE_BY_LANG.get(lang)
+        if query_src:
+            try:
+                QUERY_BY_LANG[lang] = Query(language, query_src)
+            except Exception as qe:
+                print(f"DEBUG: query compile failed for {lang}: {qe}")
+        LANG_CAPSULE_BY_LANG[lang] = language
+        return language
+
+def get_parser(lang: str) -> Optional["Parser"]:
+    """Return this thread's Parser for lang, building it on first use."""
+    language = _load_language(lang)
+    if language is None:
+        return None
+    parsers = getattr(_TLS, 'parsers', None)
+    if parsers is None:
+        parsers = _TLS.parsers = {}
+    parser = parsers.get(lang)
+    if parser is None:
+        parser = parsers[lang] = Parser(language)
+    return parser
+
 def get_language_object(module_name: str, lang_key: str):
     """
     Dynamically get the Language object from a module.
@@ -107,45 +281,41 @@ def get_language_object(module_name: str, lang_key: str):
     # If nothing works, raise an error
     raise AttributeError(f"Could not find language() in {module_name}")
 
-if TREE_SITTER_AVAILABLE:
-    print("DEBUG: tree_sitter available. Loading pre-compiled language wheels...")
-    for lang_key, lang_name in COMPILED_LANGS.items():
-        lang_info = LANG_MODULES.get(lang_key)
-        if not lang_info:
-            print(f"DEBUG: no module mapping for {lang_key}; skipping.")
-            continue
-        
-        # Extract module name and display name from tuple
-        module_name, display_name = lang_info
-        
-        try:
-            # Get the language capsule from the module
-            lang_capsule = get_language_object(module_name, lang_key)
-            print(f"DEBUG: imported {module_name}")
-            
-            # Wrap capsule in Language object (v0.25 takes only 1 arg)
-            lang = Language(lang_capsule)
-            
-            # Create parser with Language object (v0.25+ Constructor takes language)
-            p = Parser(lang)
-            PARSER_BY_LANG[lang_key] = p
-            print(f"DEBUG: loaded parser for {lang_key} from {module_name}")
-        except ImportError as e:
-            print(f"DEBUG: {module_name} not installed for {lang_key}: {e}")
-        except Exception as e:
-            print(f"DEBUG: failed to load parser for {lang_key}: {e}")
-    
-    if PARSER_BY_LANG:
-        print(f"DEBUG: successfully loaded {len(PARSER_BY_LANG)} parsers: {list(PARSER_BY_LANG.keys())}")
+# -------- node selection heuristics (simple) --------
+def _query_capture_nodes(query, root_node):
+    # normalize across binding versions: v0.25 uses a QueryCursor and
+    # returns {name: [nodes]}, older versions return [(node, name), ...]
+    if QueryCursor is not None:
+        captures = QueryCursor(query).captures(root_node)
     else:
-        print("DEBUG: no parsers loaded; fallback chunkers will be used for all files.")
-else:
-    print("DEBUG: tree_sitter Python binding NOT available; using fallback chunkers only.")
+        captures = query.captures(root_node)
+    if isinstance(captures, dict):
+        nodes = [n for ns in captures.values() for n in ns]
+    else:
+        nodes = [n for n, _name in captures]
+    return nodes
 
-# -------- node selection heuristics (simple) --------
 def select_nodes_for_lang(root_node, lang_name: str):
-    wanted = set()
     ln = lang_name.lower()
+    query = QUERY_BY_LANG.get(ln)
+    if query is not None:
+        try:
+            nodes = _query_capture_nodes(query, root_node)
+        except Exception:
+            nodes = None
+        if nodes is not None:
+            # keep only outermost matches, like the old walk that stopped
+            # recursing at the first wanted node
+            nodes.sort(key=lambda n: (n.start_byte, -n.end_byte))
+            outer = []
+            covered_end = -1
+            for n in nodes:
+                if n.start_byte >= covered_end:
+                    outer.append(n)
+                    covered_end = n.end_byte
+            return outer
+    # Python-level walk for languages without a compiled query
+    wanted = set()
     if ln == 'python':
         wanted = {'function_definition', 'class_definition', 'module'}
     elif ln in ('javascript', 'typescript'):
@@ -169,16 +339,25 @@ def select_nodes_for_lang(root_node, lang_name: str):
     return results
 
 # -------- AST chunker (Tree-sitter) --------
-def ast_chunk_file(path: str, content: str, lang: str) -> List[Dict]:
-    if lang not in PARSER_BY_LANG:
+def ast_chunk_file(path: str, content: str, lang: str,
+                   lines: Optional[List[str]] = None,
+                   content_bytes: Optional[bytes] = None) -> List[Dict]:
+    parser = get_parser(lang)
+    if parser is None:
         return []
-    parser = PARSER_BY_LANG[lang]
+    # callers that already encoded the content (e.g. for hashing) pass the
+    # bytes in; Tree-sitter and the line-start table both work on bytes
+    if content_bytes is None:
+        content_bytes = content.encode('utf8')
     try:
-        tree = parser.parse(content.encode('utf8'))
+        tree = parser.parse(content_bytes)
     except Exception:
         return []
     root = tree.root_node
-    line_starts = compute_line_starts(content)
+    # line list and byte offsets are shared across all nodes of the file
+    if lines is None:
+        lines = split_content_lines(content)
+    line_starts = compute_line_starts(content_bytes)
     nodes = select_nodes_for_lang(root, lang)
     chunks = []
     prev_chunk = None
@@ -189,23 +368,18 @@ def ast_chunk_file(path: str, content: str, lang: str) -> List[Dict]:
         end_line = byte_to_line(max(0, ebyte-1), line_starts)
         sline = max(0, start_line - OVERLAP_LINES)
         eline = end_line + OVERLAP_LINES
-        text = slice_lines(content, sline, eline)
+        text = slice_lines(lines, sline, eline)
         # merge tiny to previous
         if len(text) < MIN_CHARS and prev_chunk:
             prev_chunk['text'] = prev_chunk['text'] + '\n' + text
             prev_chunk['end_line'] = eline + 1
             prev_chunk['id'] = make_id(path, prev_chunk['start_line'], prev_chunk['end_line'], prev_chunk['text'][:200])
             continue
-        # big: split by lines
+        # big: split by lines (reuse the shared list, no re-split)
         if len(text) > MAX_CHARS:
-            lines = text.splitlines()
-            i = 0
-            while i < len(lines):
-                j = i
-                block = []
-                while j < len(lines) and len('\n'.join(block)) < MAX_CHARS:
-                    block.append(lines[j]); j += 1
-                block_text = '\n'.join(block) + '\n'
+            node_lines = lines[max(0, sline):min(len(lines), eline + 1)]
+            for i, j in split_line_blocks(node_lines):
+                block_text = '\n'.join(node_lines[i:j]) + '\n'
                 sline_block = sline + i
                 eline_block = sline + j - 1
                 ch = {
@@ -219,7 +393,6 @@ def ast_chunk_file(path: str, content: str, lang: str) -> List[Dict]:
                 }
                 chunks.append(ch)
                 prev_chunk = ch
-                i = j - OVERLAP_LINES if (j - OVERLAP_LINES) > i else j
         else:
             ch = {
                 'id': make_id(path, sline+1, eline+1, text[:200]),
@@ -235,13 +408,14 @@ def ast_chunk_file(path: str, content: str, lang: str) -> List[Dict]:
     return chunks
 
 # -------- Fallback chunkers --------
-def fallback_chunk_markdown(path: str, content: str) -> List[Dict]:
-    lines = content.splitlines()
+def fallback_chunk_markdown(path: str, content: str, lines: Optional[List[str]] = None) -> List[Dict]:
+    if lines is None:
+        lines = split_content_lines(content)
     chunks = []
     cur_lines = []
     cur_start = 0
     for i, line in enumerate(lines):
-        if line.strip().startswith('#'):
+        if HEADING_RE.match(line):
             if cur_lines:
                 txt = '\n'.join(cur_lines) + '\n'
                 chunks.append({
@@ -270,33 +444,36 @@ def fallback_chunk_markdown(path: str, content: str) -> List[Dict]:
         })
     return chunks
 
-def fallback_chunk_json(path: str, content: str) -> List[Dict]:
+def fallback_chunk_json(path: str, content: str, lines: Optional[List[str]] = None) -> List[Dict]:
     try:
-        obj = json.loads(content)
+        obj = _json_loads(content)
     except Exception:
-        return fallback_chunk_generic(path, content)
+        return fallback_chunk_generic(path, content, lines)
     chunks = []
     if isinstance(obj, dict):
         for i, (k, v) in enumerate(obj.items()):
-            body = json.dumps({k: v}, indent=2)
+            # id must come from the stored text (body + newline): the
+            # cache's rename-rewrite recomputes ids from text[:200], and
+            # any mismatch would mint fresh ids for already-stored vectors
+            body = _json_dumps_indented({k: v}) + '\n'
             chunks.append({
                 'id': make_id(path, i+1, i+1, body[:200]),
                 'file_path': path,
                 'start_line': i+1,
                 'end_line': i+1,
-                'text': body + '\n',
+                'text': body,
                 'lang': 'json',
                 'is_fallback': True
             })
     elif isinstance(obj, list):
         for i, item in enumerate(obj):
-            body = json.dumps(item, indent=2)
+            body = _json_dumps_indented(item) + '\n'
             chunks.append({
                 'id': make_id(path, i+1, i+1, body[:200]),
                 'file_path': path,
                 'start_line': i+1,
                 'end_line': i+1,
-                'text': body + '\n',
+                'text': body,
                 'lang': 'json',
                 'is_fallback': True
             })
@@ -312,19 +489,14 @@ def fallback_chunk_json(path: str, content: str) -> List[Dict]:
         })
     return chunks
 
-def fallback_chunk_generic(path: str, content: str) -> List[Dict]:
-    lines = content.splitlines()
+def fallback_chunk_generic(path: str, content: str, lines: Optional[List[str]] = None) -> List[Dict]:
+    if lines is None:
+        lines = split_content_lines(content)
     if not lines:
         return []
     chunks = []
-    i = 0
-    n = len(lines)
-    while i < n:
-        j = i
-        block = []
-        while j < n and len('\n'.join(block)) < MAX_CHARS:
-            block.append(lines[j]); j += 1
-        text = '\n'.join(block) + '\n'
+    for i, j in split_line_blocks(lines):
+        text = '\n'.join(lines[i:j]) + '\n'
         chunks.append({
             'id': make_id(path, i+1, j, text[:200]),
             'file_path': path,
@@ -334,45 +506,168 @@ def fallback_chunk_generic(path: str, content: str) -> List[Dict]:
             'lang': detect_lang_from_path(path) or 'text',
             'is_fallback': True
         })
-        i = j - OVERLAP_LINES if (j - OVERLAP_LINES) > i else j
     return chunks
 
+# -------- chunk cache --------
+# Chunks keyed by sha256(content + extension + schema version) so
+# re-ingesting a repo only parses files that actually changed; the
+# extension is part of the key because identical bytes chunk differently
+# under, say, .py and .md names. Bump _CACHE_SCHEMA whenever chunk shape
+# or id derivation changes, so stale entries miss instead of serving
+# chunks a fresh run would no longer produce. One JSON file per key;
+# writes go through os.replace so concurrent worker processes never see
+# half-written entries.
+_CACHE_SCHEMA = b'2'
+CHUNK_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.chunk_cache')
+
+def _cache_path(cache_key: str) -> str:
+    return os.path.join(CHUNK_CACHE_DIR, cache_key + '.json')
+
+def _load_cached_chunks(cache_key: str, path: str) -> Optional[List[Dict]]:
+    try:
+        with open(_cache_path(cache_key), 'rb') as fh:
+            chunks = _json_loads(fh.read())
+    except Exception:
+        return None
+    # Same content can reappear under a different path (renames, forks);
+    # rewrite path-derived fields so cached chunks stay consistent.
+    for ch in chunks:
+        if ch.get('file_path') != path:
+            ch['file_path'] = path
+            ch['id'] = make_id(path, ch['start_line'], ch['end_line'], ch.get('text', '')[:200])
+    return chunks
+
+def _store_cached_chunks(cache_key: str, chunks: List[Dict]) -> None:
+    try:
+        os.makedirs(CHUNK_CACHE_DIR, exist_ok=True)
+        tmp_path = _cache_path(cache_key) + f'.tmp{os.getpid()}'
+        if orjson is not None:
+            payload = orjson.dumps(chunks)
+        else:
+            payload = json.dumps(chunks, ensure_ascii=False).encode('utf8')
+        with open(tmp_path, 'wb') as fh:
+            fh.write(payload)
+        os.replace(tmp_path, _cache_path(cache_key))
+    except Exception:
+        pass  # cache is best-effort; never fail the chunking itself
+
 # -------- main chunk dispatcher --------
 def chunk_file_entry(entry: Dict) -> List[Dict]:
     path = entry.get('path', '<unknown>')
-    content = entry.get('content', '')
+    # entries may carry raw bytes (file_reader defers decoding) or str
+    # (the JSON CLI path); either way the hash, Tree-sitter and the
+    # line-start table want bytes, and a cache hit needs nothing else
+    content = entry.get('content')
+    content_bytes = entry.get('content_bytes')
+    if content_bytes is None:
+        content_bytes = (content or '').encode('utf8')
+    # key on content + extension: the same bytes chunk differently
+    # depending on the path-derived language and fallback choice
+    ext = path.rpartition('.')[2].lower()
+    h = hashlib.sha256(content_bytes)
+    h.update(b'\x00')
+    h.update(ext.encode('utf8'))
+    h.update(b'\x00')
+    h.update(_CACHE_SCHEMA)
+    cache_key = h.hexdigest()
+    cached = _load_cached_chunks(cache_key, path)
+    if cached is not None:
+        return cached
+    if content is None:
+        content = content_bytes.decode('utf-8', errors='ignore')
     lang = detect_lang_from_path(path)
+    # split once per file; every chunker below shares this list
+    lines = split_content_lines(content)
     chunks = []
-    if lang and lang in PARSER_BY_LANG:
+    if lang and lang in SUPPORTED_LANGS:
         try:
-            chunks = ast_chunk_file(path, content, lang)
+            chunks = ast_chunk_file(path, content, lang, lines, content_bytes)
         except Exception:
             chunks = []
     if not chunks:
         if (path.lower().endswith('.md') or lang == 'markdown'):
-            chunks = fallback_chunk_markdown(path, content)
+            chunks = fallback_chunk_markdown(path, content, lines)
         elif (path.lower().endswith('.json') or lang == 'json'):
-            chunks = fallback_chunk_json(path, content)
+            chunks = fallback_chunk_json(path, content, lines)
         else:
-            chunks = fallback_chunk_generic(path, content)
+            chunks = fallback_chunk_generic(path, content, lines)
     if not chunks:
         chunks = [{
             'id': make_id(path, 1, 1, content[:200]),
             'file_path': path,
             'start_line': 1,
-            'end_line': max(1, len(content.splitlines())),
+            'end_line': max(1, len(lines)),
             'text': content,
             'lang': lang or 'unknown',
             'is_fallback': True
         }]
+    _store_cached_chunks(cache_key, chunks)
     return chunks
 
-def process_files(entries: List[Dict]) -> List[Dict]:
-    out = []
+def iter_file_chunks(entries: List[Dict]):
+    """Yield the chunk list for one file at a time (streaming-friendly)."""
     for e in entries:
-        chs = chunk_file_entry(e)
-        out.extend(chs)
-    return out
+        yield chunk_file_entry(e)
+
+# Below this many files the process-pool spawn cost outweighs the win.
+MIN_FILES_FOR_POOL = 32
+
+def process_files(entries: List[Dict]) -> List[Dict]:
+    # Files are independent, so fan parsing out across cores. Each worker
+    # process re-imports this module and builds its own parsers lazily via
+    # get_parser(); chunk_file_entry is top-level so it pickles cleanly.
+    if len(entries) < MIN_FILES_FOR_POOL:
+        return list(chain.from_iterable(iter_file_chunks(entries)))
+    cpu = os.cpu_count() or 1
+    chunksize = max(1, len(entries) // (4 * cpu))
+    with ProcessPoolExecutor(max_workers=cpu) as executor:
+        results = executor.map(chunk_file_entry, entries, chunksize=chunksize)
+        return list(chain.from_iterable(results))
+
+# name used by the pipeline notes in main.py
+chunk_files = process_files
+
+def iter_entries_from_json(path: str):
+    """Yield file entries from a JSON array or JSONL file.
+
+    JSONL (one object per line, as save_files_to_jsonl writes) streams
+    line by line with no array parser at all; arrays stream via ijson
+    when it's installed. The format is sniffed from the first byte.
+    """
+    with open(path, 'rb') as fh:
+        head = fh.read(1)
+        fh.seek(0)
+        if head != b'[':
+            loads = _json_loads
+            for line in fh:
+                line = line.strip()
+                if line:
+                    yield loads(line)
+        elif ijson is not None:
+            yield from ijson.items(fh, 'item')
+        else:
+            yield from json.load(fh)
+
+def write_chunks_json(chunks_iter, output_path: str) -> int:
+    """Write chunks incrementally as a JSON array; returns chunk count.
+
+    Never holds more than one serialized chunk in memory, so a 50MB
+    result file doesn't need 50MB of RAM on top of the chunks themselves.
+    """
+    if orjson is not None:
+        dumps = lambda obj: orjson.dumps(obj).decode()
+    else:
+        dumps = lambda obj: json.dumps(obj, ensure_ascii=False)
+    count = 0
+    with open(output_path, 'w', encoding='utf8') as fh:
+        fh.write('[')
+        for ch in chunks_iter:
+            if count:
+                fh.write(',\n')
+            fh.write(dumps(ch))
+            count += 1
+        fh.write(']')
+    return count
 
 def chunk_and_save(input_json_path: str, output_json_path: str = "result.json") -> List[Dict]:
     """
@@ -388,23 +683,21 @@ def chunk_and_save(input_json_path: str, output_json_path: str = "result.json")
     """
     print(f"[chunker] Loading files from {input_json_path}...")
     try:
-        with open(input_json_path, 'r', encoding='utf8') as fh:
-            entries = json.load(fh)
+        entries = list(iter_entries_from_json(input_json_path))
     except Exception as e:
         print(f"[ERROR] Failed to load {input_json_path}: {e}")
         return []
-    
+
     print(f"[chunker] Processing {len(entries)} files...")
     chunks = process_files(entries)
-    
+
     print(f"[chunker] Saving {len(chunks)} chunks to {output_json_path}...")
     try:
-        with open(output_json_path, 'w', encoding='utf8') as fh:
-            json.dump(chunks, fh, indent=2, ensure_ascii=False)
+        write_chunks_json(chunks, output_json_path)
         print(f"[chunker] ✓ Chunks saved to {output_json_path}")
     except Exception as e:
         print(f"[ERROR] Failed to save chunks: {e}")
-    
+
     return chunks
 
 # -------- CLI usage --------
@@ -414,9 +707,9 @@ def main():
         sys.exit(1)
     inp = sys.argv[1]
     outp = sys.argv[2] if len(sys.argv) > 2 else "chunks.json"
-    entries = []
     if os.path.isdir(inp):
         # read all text files (simple)
+        entries = []
         for root, _, files in os.walk(inp):
             for fn in files:
                 fp = os.path.join(root, fn)
@@ -426,16 +719,16 @@ def main():
                         entries.append({'path': rel, 'content': fh.read()})
                 except Exception:
                     continue
+        count = write_chunks_json(process_files(entries), outp)
     else:
-        with open(inp, 'r', encoding='utf8') as fh:
-            entries = json.load(fh)
-    chunks = process_files(entries)
-    with open(outp, 'w', encoding='utf8') as fh:
-        json.dump(chunks, fh, indent=2, ensure_ascii=False)
-    print(f"Wrote {len(chunks)} chunks to {outp}")
-    # helpful debug: show loaded parsers
+        # stream the JSON array end-to-end: one entry in, its chunks out,
+        # so a multi-GB input never lives in memory at once
+        entries = iter_entries_from_json(inp)
+        count = write_chunks_json(chain.from_iterable(iter_file_chunks(entries)), outp)
+    print(f"Wrote {count} chunks to {outp}")
+    # helpful debug: show loaded languages
     try:
-        print("Loaded parsers:", list(PARSER_BY_LANG.keys()))
+        print("Loaded languages:", list(LANG_CAPSULE_BY_LANG.keys()))
     except Exception:
         pass
 
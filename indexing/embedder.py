@@ -1,213 +1,559 @@
-import sys
-from openai import OpenAI
-from pinecone import Pinecone
+import asyncio
+import collections
+import functools
+import hashlib
+import logging
+import random
+import re
+import struct
+import threading
+import time
 from dotenv import load_dotenv
 import os
-import json
 
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 
-if not OPENAI_API_KEY or not PINECONE_API_KEY:
-    print("Error: Missing API keys in .env file")
-    sys.exit(1)
+# Per-chunk/per-batch progress used to go through print(), which writes to
+# stdout synchronously on every call; logging is free when the level is
+# INFO+ and the handler config lives with the entrypoint (api.py).
+log = logging.getLogger("knowthecode.embedder")
 
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
-pc = Pinecone(api_key=PINECONE_API_KEY)
+# openai and pinecone are heavy imports; constructing the clients lazily
+# keeps API cold start fast and lets uvicorn workers fork before any of
+# this is paid for.
+_openai_client = None
+_async_openai_client = None
+_pc = None
+_CLIENT_LOCK = threading.Lock()
 
 
-def namespace_exists(index_name: str, repo_id: str) -> bool:
-    """Check if a namespace exists in Pinecone."""
+def _require_key(name: str) -> str:
+    key = os.getenv(name)
+    if not key:
+        # raise rather than sys.exit: the key is only needed at first
+        # client use, and an import or unrelated code path shouldn't be
+        # able to kill the whole process over it
+        raise RuntimeError(f"Missing {name} in .env file")
+    return key
+
+
+def get_openai():
+    """Memoized sync OpenAI client."""
+    global _openai_client
+    if _openai_client is None:
+        with _CLIENT_LOCK:
+            if _openai_client is None:
+                from openai import OpenAI
+                _openai_client = OpenAI(api_key=_require_key("OPENAI_API_KEY"))
+    return _openai_client
+
+
+def get_async_openai():
+    """Memoized AsyncOpenAI client."""
+    global _async_openai_client
+    if _async_openai_client is None:
+        with _CLIENT_LOCK:
+            if _async_openai_client is None:
+                from openai import AsyncOpenAI
+                _async_openai_client = AsyncOpenAI(api_key=_require_key("OPENAI_API_KEY"))
+    return _async_openai_client
+
+
+def get_pinecone():
+    """Memoized Pinecone client."""
+    global _pc
+    if _pc is None:
+        with _CLIENT_LOCK:
+            if _pc is None:
+                from pinecone import Pinecone
+                _pc = Pinecone(api_key=_require_key("PINECONE_API_KEY"))
+    return _pc
+
+EMBED_MODEL = "text-embedding-3-small"
+# text-embedding-3 supports native dimension reduction; 768 halves Pinecone
+# storage and speeds up cosine search with near-identical retrieval quality
+EMBED_DIMENSIONS = 768
+# chunks can reach MAX_CHARS (3000) but metadata only keeps 500 chars; cap
+# the embedded text so token cost tracks what retrieval actually surfaces
+EMBED_MAX_INPUT_CHARS = 2000
+# the model rejects any single input over 8192 tokens, and one oversized
+# input fails its whole batch; truncate per chunk well under that line
+EMBED_MAX_INPUT_TOKENS = 8000
+EMBED_BATCH_SIZE = 96      # inputs per OpenAI request
+EMBED_MAX_TOKENS_PER_REQUEST = 250_000  # stay under the 300k/request limit
+EMBED_CONCURRENCY = 8      # requests in flight at once
+EMBED_MAX_RETRIES = 5
+
+# metadata text preview: whitespace runs collapsed (code indentation is
+# mostly noise in a preview) and capped; Pinecone bills metadata bytes and
+# every upsert ships them over the wire
+META_TEXT_CHARS = 400
+_WS_RE = re.compile(r"\s+")
+
+UPSERT_POOL_THREADS = 30   # parallel upsert requests in flight
+
+
+# -------- local embedding cache --------
+# Embeddings keyed by sha256(model|dims|text) in a small SQLite file, so
+# re-indexing a repo whose chunks barely changed skips most OpenAI calls.
+EMB_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.emb_cache.sqlite3')
+
+_emb_db = None
+_EMB_DB_LOCK = threading.Lock()
+
+
+def _get_emb_db():
+    global _emb_db
+    if _emb_db is None:
+        with _EMB_DB_LOCK:
+            if _emb_db is None:
+                import sqlite3
+                db = sqlite3.connect(EMB_CACHE_PATH, check_same_thread=False)
+                db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB)")
+                db.commit()
+                _emb_db = db
+    return _emb_db
+
+
+def _emb_cache_key(text: str) -> str:
+    return hashlib.sha256(f"{EMBED_MODEL}|{EMBED_DIMENSIONS}|{text}".encode('utf8')).hexdigest()
+
+
+def _pack_vec(vec: list[float]) -> bytes:
+    # half precision halves cache size; cosine similarity is insensitive
+    # to the ~3 decimal digits fp16 keeps. Pinecone still gets the full
+    # float values on first upsert since packing only happens at cache write.
+    return struct.pack(f'{len(vec)}e', *vec)
+
+
+def _unpack_vec(blob: bytes) -> list[float]:
+    return list(struct.unpack(f'{len(blob) // 2}e', blob))
+
+
+def _emb_cache_get_many(keys: list[str]) -> dict:
+    """Look up cached vectors; any failure just means a cache miss."""
+    out = {}
     try:
-        index = pc.Index(index_name)
-        stats = index.describe_index_stats()
-        return repo_id in stats.get('namespaces', {})
-    except Exception:
-        return False
+        db = _get_emb_db()
+        with _EMB_DB_LOCK:
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = db.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({placeholders})", batch)
+                for key, blob in rows:
+                    out[key] = _unpack_vec(blob)
+    except Exception as e:
+        log.error("Error reading embedding cache: %s", e)
+    return out
+
+
+def _emb_cache_put_many(items: dict) -> None:
+    try:
+        db = _get_emb_db()
+        with _EMB_DB_LOCK:
+            db.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                [(k, _pack_vec(v)) for k, v in items.items()])
+            db.commit()
+    except Exception as e:
+        log.error("Error writing embedding cache: %s", e)
+
+
+_encoder = None
+
+
+def _truncate_for_embedding(text: str) -> tuple[str, bool]:
+    """Cap one chunk's text for the embeddings API.
+
+    The char cap alone already keeps inputs under the model's 8192-token
+    limit, but an exact token-level cut (when tiktoken is around) makes
+    that robust against the char limit ever being raised. Returns the
+    text plus whether anything was cut, so callers can report it instead
+    of silently losing content.
+    """
+    truncated = len(text) > EMBED_MAX_INPUT_CHARS
+    text = text[:EMBED_MAX_INPUT_CHARS]
+    if _encoder:
+        tokens = _encoder.encode(text)
+        if len(tokens) > EMBED_MAX_INPUT_TOKENS:
+            text = _encoder.decode(tokens[:EMBED_MAX_INPUT_TOKENS])
+            truncated = True
+    return text, truncated
+
+
+def _count_tokens(text: str) -> int:
+    """Token count for batching; exact via tiktoken, else ~4 chars/token."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.encoding_for_model(EMBED_MODEL)
+        except Exception:
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text))
+    return len(text) // 4 + 1
+
+
+def _batched(texts: list[str], max_items: int = EMBED_BATCH_SIZE,
+             max_tokens: int = EMBED_MAX_TOKENS_PER_REQUEST):
+    """Yield consecutive sub-lists bounded by item count AND token count.
+
+    Count-only batching can still blow the per-request token limit when
+    chunks run long, which fails the whole call; bounding by tokens keeps
+    every request acceptable. Consecutive slices preserve input order.
+    """
+    batch: list[str] = []
+    batch_tokens = 0
+    for text in texts:
+        text_tokens = _count_tokens(text)
+        if batch and (len(batch) >= max_items or batch_tokens + text_tokens > max_tokens):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append(text)
+        batch_tokens += text_tokens
+    if batch:
+        yield batch
+
+
+async def _embed_texts_async(texts: list[str], sem: asyncio.Semaphore = None) -> tuple[list, int]:
+    """Embed texts in fixed-size batches dispatched concurrently.
+
+    One giant embeddings.create call serializes on a single round-trip and
+    can blow the per-request token limit on large repos; instead fire
+    EMBED_BATCH_SIZE-sized batches with up to EMBED_CONCURRENCY in flight,
+    backing off exponentially on rate limits. Texts already in the local
+    embedding cache skip the API entirely. Returns (embeddings, tokens)
+    with embeddings in input order; tokens only counts cache misses.
+    """
+    from openai import RateLimitError
+
+    # serve what we can from the cache; only misses hit the API
+    keys = [_emb_cache_key(t) for t in texts]
+    cached = await asyncio.to_thread(_emb_cache_get_many, list(set(keys)))
+    miss_texts_by_key = {}
+    for key, text in zip(keys, texts):
+        if key not in cached:
+            miss_texts_by_key.setdefault(key, text)
+    if not miss_texts_by_key:
+        return [cached[k] for k in keys], 0
+    miss_keys = list(miss_texts_by_key)
+    miss_texts = list(miss_texts_by_key.values())
+
+    client = get_async_openai()
+    if sem is None:
+        sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+    async def embed_batch(batch):
+        async with sem:
+            # small jitter so concurrent batches don't fire in lockstep
+            # and trip the rate limiter all at once
+            await asyncio.sleep(random.uniform(0, 0.05))
+            delay = 1.0
+            for attempt in range(EMBED_MAX_RETRIES):
+                try:
+                    return await client.embeddings.create(
+                        model=EMBED_MODEL,
+                        input=batch,
+                        dimensions=EMBED_DIMENSIONS
+                    )
+                except RateLimitError:
+                    if attempt == EMBED_MAX_RETRIES - 1:
+                        raise
+                    await asyncio.sleep(delay)
+                    delay *= 2
+
+    responses = await asyncio.gather(*(embed_batch(b) for b in _batched(miss_texts)))
+
+    miss_embeddings = []
+    total_tokens = 0
+    for response in responses:
+        miss_embeddings.extend(item.embedding for item in response.data)
+        total_tokens += response.usage.total_tokens
+
+    new_vecs = dict(zip(miss_keys, miss_embeddings))
+    await asyncio.to_thread(_emb_cache_put_many, new_vecs)
+    cached.update(new_vecs)
+    return [cached[k] for k in keys], total_tokens
+
+
+FETCH_BATCH_SIZE = 1000    # Pinecone fetch accepts up to 1000 IDs
+
+# Index handles and namespace-existence checks both cost a Pinecone
+# round-trip to set up / answer. Rather than caching one bool per
+# (index, repo) pair, cache the whole namespace set per index with a TTL:
+# one stats call then answers every repo check in O(1) until it expires.
+NS_CACHE_TTL = 60.0
+
+# Exact-string LRU for query embeddings. functools.lru_cache doesn't fit
+# an async call path, so this is a plain OrderedDict evicting oldest-used.
+QUERY_CACHE_SIZE = 1024
+_QUERY_EMB_CACHE: "collections.OrderedDict[str, list]" = collections.OrderedDict()
+_QUERY_CACHE_LOCK = threading.Lock()
+
+_NS_SET_CACHE: dict[str, tuple[float, set]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def vector_metadata(chunk: dict, text: str) -> dict:
+    """Per-vector Pinecone metadata for one chunk.
+
+    repo_id is deliberately absent — it's already the namespace, so
+    storing it per vector just inflates every upsert payload — and the
+    text preview ships with whitespace runs collapsed and capped at
+    META_TEXT_CHARS. Shared by embed_chunks and the streaming pipeline
+    so the two paths can't drift apart.
+    """
+    return {
+        "file_path": chunk.get("file_path", ""),
+        "text": _WS_RE.sub(" ", text)[:META_TEXT_CHARS],
+        "lang": chunk.get("lang", "unknown"),
+        "start_line": chunk.get("start_line", 0),
+        "end_line": chunk.get("end_line", 0),
+    }
+
+
+@functools.lru_cache(maxsize=8)
+def get_index(index_name: str):
+    """Return a memoized Index handle for index_name."""
+    return get_pinecone().Index(index_name, pool_threads=UPSERT_POOL_THREADS)
+
+
+def _fetch_existing_ids(index, ids: list[str], repo_id: str) -> set:
+    """Return the subset of ids already stored in the namespace."""
+    existing = set()
+    try:
+        for i in range(0, len(ids), FETCH_BATCH_SIZE):
+            fetched = index.fetch(ids=ids[i:i + FETCH_BATCH_SIZE], namespace=repo_id)
+            vectors = getattr(fetched, 'vectors', None)
+            if vectors is None:
+                vectors = fetched.get('vectors', {})
+            existing.update(vectors.keys())
+    except Exception as e:
+        # on any failure just re-embed everything; upserts are idempotent
+        log.error("Error fetching existing ids: %s", e)
+        return set()
+    return existing
+
 
 def embed_chunks(chunks: list[dict], index_name: str = "code-chunks", repo_id: str = "default"):
     """Embed code chunks and store in Pinecone vector database."""
     if not chunks:
         return None
     
-    valid_chunks = [c for c in chunks if c.get("text", "").strip()]
-    if not valid_chunks:
-        return None
-    
-    texts = [chunk.get("text", "").strip() for chunk in valid_chunks]
-    
-    try:
-        response = openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=texts
-        )
-        embeddings = [item.embedding for item in response.data]
-        total_tokens = response.usage.total_tokens
-    except Exception as e:
-        print(f"Error embedding chunks: {e}")
+    # one pass over the input: drop empty chunks, strip once, and pair each
+    # chunk with its content-addressed id (no separate valid_chunks/texts
+    # passes over 10k+ dicts)
+    entries = []
+    for i, c in enumerate(chunks):
+        text = c.get("text", "").strip()
+        if text:
+            entries.append((c.get("id", f"chunk_{i}"), c, text))
+    if not entries:
         return None
-    
+    num_valid = len(entries)
+
     try:
-        index = pc.Index(index_name)
+        index = get_index(index_name)
     except:
         try:
-            pc.create_index(
+            get_pinecone().create_index(
                 name=index_name,
-                dimension=1536,
+                dimension=EMBED_DIMENSIONS,
                 metric="cosine",
                 spec={"serverless": {"cloud": "aws", "region": "us-east-1"}}
             )
-            index = pc.Index(index_name)
+            index = get_index(index_name)
         except Exception as e:
-            print(f"Error creating index: {e}")
+            log.error("Error creating index: %s", e)
             return None
-    
-    vectors = []
-    for i, chunk in enumerate(valid_chunks):
-        vectors.append((
-            chunk.get("id", f"chunk_{i}"),
-            embeddings[i],
-            {
-                "file_path": chunk.get("path", ""),
-                "text": chunk.get("text", "")[:500],
-                "lang": chunk.get("lang", "unknown"),
-                "start_line": chunk.get("start_line", 0),
-                "end_line": chunk.get("end_line", 0),
-                "repo_id": repo_id,
-            }
-        ))
-    
-    batch_size = 25
+
+    # Chunk IDs are content-addressed, so anything already in the namespace
+    # doesn't need re-embedding; fetch in batches to find what's new.
+    existing_ids = _fetch_existing_ids(index, [cid for cid, _, _ in entries], repo_id)
+    if existing_ids:
+        entries = [e for e in entries if e[0] not in existing_ids]
+    num_skipped = num_valid - len(entries)
+
+    if not entries:
+        return {
+            "num_embedded": 0,
+            "num_skipped": num_skipped,
+            "num_truncated": 0,
+            "total_tokens": 0,
+            "index_name": index_name,
+            "repo_id": repo_id
+        }
+
+    async def _embed_and_upsert() -> int:
+        """Pipeline embedding against upserting, batch by batch.
+
+        Embedding everything before the first upsert starts means the two
+        network waits add up; here each batch's upsert fires as soon as
+        its embeddings land, so wall time approaches the longer of the
+        two instead of their sum. One shared semaphore bounds OpenAI
+        concurrency across batches.
+        """
+        sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+        # byte-identical texts (license headers, boilerplate __init__.py,
+        # vendored snippets) embed once; every chunk still gets its own
+        # vector id and metadata, only the vector values are shared
+        by_text: dict[str, list] = {}
+        for entry in entries:
+            by_text.setdefault(entry[2], []).append(entry)
+        unique = list(by_text.items())
+
+        async def one_batch(group):
+            capped = [_truncate_for_embedding(text) for text, _ in group]
+            texts = [text for text, _ in capped]
+            num_truncated = sum(was_cut for _, was_cut in capped)
+            embeddings, tokens = await _embed_texts_async(texts, sem=sem)
+            vectors = []
+            for (_, dups), embedding in zip(group, embeddings):
+                for chunk_id, chunk, text in dups:
+                    vectors.append((chunk_id, embedding, vector_metadata(chunk, text)))
+            # duplicates can fan one embed batch out past Pinecone's
+            # recommended upsert size, so slice the upserts separately
+            for i in range(0, len(vectors), 100):
+                await asyncio.to_thread(
+                    index.upsert, vectors=vectors[i:i + 100], namespace=repo_id)
+            return tokens, num_truncated
+
+        groups = [unique[i:i + EMBED_BATCH_SIZE]
+                  for i in range(0, len(unique), EMBED_BATCH_SIZE)]
+        results = await asyncio.gather(*(one_batch(g) for g in groups))
+        return sum(t for t, _ in results), sum(n for _, n in results)
+
     try:
-        for i in range(0, len(vectors), batch_size):
-            index.upsert(vectors=vectors[i:i + batch_size], namespace=repo_id)
+        total_tokens, num_truncated = asyncio.run(_embed_and_upsert())
     except Exception as e:
-        print(f"Error upserting to Pinecone: {e}")
+        log.error("Error embedding/upserting chunks: %s", e)
         return None
+
+    # the namespace definitely exists now; keep the cached set honest
+    with _CACHE_LOCK:
+        cached = _NS_SET_CACHE.get(index_name)
+        if cached is not None:
+            cached[1].add(repo_id)
     
     return {
-        "num_embedded": len(chunks),
+        "num_embedded": len(entries),
+        "num_skipped": num_skipped,
+        "num_truncated": num_truncated,
         "total_tokens": total_tokens,
         "index_name": index_name,
         "repo_id": repo_id
     }
 
-def retrieve_chunks(query: str, index_name: str = "code-chunks", repo_id: str = "default", top_k: int = 5):
-    """Retrieve relevant code chunks from Pinecone based on query similarity."""
-    try:
-        query_response = openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=[query]
-        )
-        query_embedding = query_response.data[0].embedding
-    except Exception as e:
-        print(f"Error embedding query: {e}")
+async def retrieve_chunks(query, index_name: str = "code-chunks", repo_id: str = "default", top_k: int = 5):
+    """Retrieve relevant code chunks from Pinecone based on query similarity.
+
+    Accepts a single query string (returns one match list) or a list of
+    queries (returns one match list per query, in order). Batched calls
+    embed every cache-missed query in one embeddings request — the API
+    prices and round-trips per request, not per input — and fan the
+    Pinecone searches out concurrently. Fully async so the API can await
+    it on the event loop; only the sync Pinecone queries are pushed to
+    threads. Query embeddings are memoized on the exact query string, so
+    a repeated or retried question skips the OpenAI round-trip entirely.
+    """
+    single = isinstance(query, str)
+    queries = [query] if single else list(query)
+    if not queries:
         return []
-    
+
+    embeddings: dict[int, list] = {}
+    with _QUERY_CACHE_LOCK:
+        for i, q in enumerate(queries):
+            hit = _QUERY_EMB_CACHE.get(q)
+            if hit is not None:
+                _QUERY_EMB_CACHE.move_to_end(q)
+                embeddings[i] = hit
+    missing = [i for i in range(len(queries)) if i not in embeddings]
+
+    if missing:
+        try:
+            response = await get_async_openai().embeddings.create(
+                model=EMBED_MODEL,
+                input=[queries[i] for i in missing],
+                dimensions=EMBED_DIMENSIONS
+            )
+        except Exception as e:
+            log.error("Error embedding queries: %s", e)
+            return [] if single else [[] for _ in queries]
+        with _QUERY_CACHE_LOCK:
+            for i, item in zip(missing, response.data):
+                embeddings[i] = item.embedding
+                _QUERY_EMB_CACHE[queries[i]] = item.embedding
+            while len(_QUERY_EMB_CACHE) > QUERY_CACHE_SIZE:
+                _QUERY_EMB_CACHE.popitem(last=False)
+
     try:
-        index = pc.Index(index_name)
-        results = index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            namespace=repo_id,
-            include_metadata=True
-        )
+        index = get_index(index_name)
     except Exception as e:
-        print(f"Error searching Pinecone: {e}")
-        return []
-    
-    return [
-        {
-            "id": match["id"],
-            "score": match["score"],
-            "metadata": match.get("metadata", {})
-        }
-        for match in results.get("matches", [])
-    ]
+        log.error("Error getting index: %s", e)
+        return [] if single else [[] for _ in queries]
+
+    async def search(embedding):
+        try:
+            results = await asyncio.to_thread(
+                index.query,
+                vector=embedding,
+                top_k=top_k,
+                namespace=repo_id,
+                include_metadata=True
+            )
+        except Exception as e:
+            log.error("Error searching Pinecone: %s", e)
+            return []
+        return [
+            {
+                "id": match["id"],
+                "score": match["score"],
+                "metadata": match.get("metadata", {})
+            }
+            for match in results.get("matches", [])
+        ]
+
+    all_matches = await asyncio.gather(
+        *(search(embeddings[i]) for i in range(len(queries))))
+    return all_matches[0] if single else all_matches
 
 
 def namespace_exists(index_name: str, repo_id: str) -> bool:
     """
     Check if a namespace (repo_id) already exists in the Pinecone index.
-    Uses a simple query to check if namespace has any vectors.
-    
+    Results are cached for NS_CACHE_TTL seconds since describe_index_stats
+    is a full HTTP round-trip.
+
     Args:
         index_name: Pinecone index name
         repo_id: namespace to check
-    
+
     Returns:
         True if namespace exists and has vectors, False otherwise
     """
+    now = time.monotonic()
+    with _CACHE_LOCK:
+        cached = _NS_SET_CACHE.get(index_name)
+        if cached is not None and now - cached[0] < NS_CACHE_TTL:
+            return repo_id in cached[1]
+
     try:
-        index = pc.Index(index_name)
+        index = get_index(index_name)
         stats = index.describe_index_stats()
-        namespaces = stats.get('namespaces', {})
-        
-        if repo_id in namespaces:
-            print(f"[namespace_exists] ✓ Namespace '{repo_id}' found in stats")
-            return True
-        
-        print(f"[namespace_exists] ✗ Namespace '{repo_id}' NOT found in stats")
-        return False
+        namespaces = set(stats.get('namespaces', {}))
     except Exception as e:
-        print(f"[ERROR] Failed to check namespace: {e}")
-        print(f"[DEBUG] This might mean the namespace truly doesn't exist yet")
+        log.error("Failed to check namespace (it may simply not exist yet): %s", e)
         return False
 
+    with _CACHE_LOCK:
+        _NS_SET_CACHE[index_name] = (now, namespaces)
+
+    found = repo_id in namespaces
+    log.debug("namespace %r %s in %r", repo_id, "found" if found else "not found", index_name)
+    return found
 
-# ============================================================
-# TEST CODE (run this file directly to test)
-# ============================================================
-if __name__ == "__main__":
-    print("\n" + "="*60)
-    print("STARTING TEST: Embedding and Retrieval")
-    print("="*60 + "\n")
-    
-    # Step 1: Load chunks
-    print("[STEP 1] Loading result.json...")
-    try:
-        with open("result.json") as f:
-            chunks = json.load(f)
-        print(f"✓ Loaded {len(chunks)} chunks\n")
-    except Exception as e:
-        print(f"✗ Error loading result.json: {e}")
-        sys.exit(1)
-    
-    # Step 2: Embed chunks
-    print("[STEP 2] Embedding chunks with OpenAI...")
-    stats = embed_chunks(chunks, index_name="code-chunks", repo_id="flask")
-    if stats:
-        print(f"\n✓ Embedding successful!")
-        print(f"  - Chunks: {stats['num_embedded']}")
-        print(f"  - Tokens: {stats['total_tokens']}")
-        print(f"  - Index: {stats['index_name']}")
-        print(f"  - Repo: {stats['repo_id']}\n")
-    else:
-        print("✗ Embedding failed")
-        sys.exit(1)
-    
-    # Step 3: Test retrieval
-    print("[STEP 3] Testing retrieval with sample queries...")
-    test_queries = [
-        "How do I handle HTTP requests?",
-        "What is the Flask app structure?",
-        "How do I create routes?",
-    ]
-    
-    for query in test_queries:
-        print(f"\n  Query: '{query}'")
-        results = retrieve_chunks(query, index_name="code-chunks", repo_id="flask", top_k=2)
-        
-        if results:
-            for idx, result in enumerate(results, 1):
-                meta = result['metadata']
-                score = result['score']
-                print(f"    [{idx}] Score: {score:.3f} | File: {meta.get('file_path', 'N/A')} | Lang: {meta.get('lang', 'N/A')}")
-                print(f"        Text: {meta.get('text', 'N/A')[:100]}...")
-        else:
-            print("    No results found")
-    
-    print("\n" + "="*60)
-    print("✓ TEST COMPLETE")
-    print("="*60)
@@ -14,8 +14,32 @@ def ingest_repo(repo_url: str) -> Path:
     repo_name = get_repo_name_from_url(repo_url)
     repo_dir = base_dir / repo_name
 
+    # An existing clone just needs its tip moved: a shallow fetch plus
+    # hard reset transfers only what changed, instead of rmtree-ing the
+    # whole tree and re-downloading it from scratch on every ingest.
+    if (repo_dir / ".git").exists():
+        try:
+            repo = Repo(repo_dir)
+            # clone dirs are keyed by repo name only, so alice/app and
+            # bob/app collide; only reuse a clone whose origin actually
+            # points at this URL, else fall through to a fresh clone
+            if repo.remotes.origin.url == repo_url:
+                repo.remotes.origin.fetch(depth=1)
+                repo.git.reset("--hard", "FETCH_HEAD")
+                return repo_dir
+        except Exception as e:
+            # corrupt or unrelated checkout: fall back to a clean clone
+            print(f"Error updating existing clone, re-cloning: {e}")
+
     if repo_dir.exists():
         shutil.rmtree(repo_dir)
 
-    Repo.clone_from(repo_url, repo_dir)
+    # Indexing only needs the working tree, so skip history, tags and
+    # other branches; transfer and disk then scale with repo size rather
+    # than repo history.
+    Repo.clone_from(
+        repo_url,
+        repo_dir,
+        multi_options=["--depth=1", "--single-branch", "--no-tags"],
+    )
     return repo_dir
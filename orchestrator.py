@@ -1,16 +1,12 @@
 from ingestion import repo_loader
 from parsing import file_reader
-from chunking import chunker
 from indexing import embedder
-from git import Repo
+import pipeline
+import asyncio
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
 
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
 
 def repo_processor(repo_url: str, progress_callback=None) -> str:
@@ -23,20 +19,29 @@ def repo_processor(repo_url: str, progress_callback=None) -> str:
     try:
         repo_dir = repo_loader.ingest_repo(repo_url)
         repo_data = file_reader.read_repo_files(repo_dir)
-        file_reader.save_files_to_json(repo_data, "output.json")
-        
-        chunks = chunker.chunk_and_save("output.json", "result.json")
-        embedder.embed_chunks(chunks, index_name="code-chunks", repo_id=repo_id)
-        
+
+        # the pipeline below consumes repo_data in memory; only dump the
+        # corpus to disk when explicitly debugging
+        if os.environ.get("DEBUG_DUMP"):
+            file_reader.save_files_to_jsonl(repo_data, "output.jsonl")
+
+        # Stream chunks straight into embedding/upserting instead of
+        # materializing the whole chunk list first (see pipeline.py).
+        pipeline.ingest_entries(repo_data, index_name="code-chunks", repo_id=repo_id)
+
         return repo_id
     except Exception as e:
         print(f"Error processing repository: {e}")
         return None
 
 
-def query_processor(query: str, repo_id: str, top_k: int = 5, progress_callback=None) -> str:
-    """Retrieve relevant code chunks and generate an answer using LLM."""
-    chunks = embedder.retrieve_chunks(query, index_name="code-chunks", repo_id=repo_id, top_k=top_k)
+async def query_processor(query: str, repo_id: str, top_k: int = 5, progress_callback=None) -> str:
+    """Retrieve relevant code chunks and generate an answer using LLM.
+
+    Async end-to-end (embed, vector search, LLM are all I/O) so the API
+    can await it directly instead of hopping through a threadpool.
+    """
+    chunks = await embedder.retrieve_chunks(query, index_name="code-chunks", repo_id=repo_id, top_k=top_k)
     
     if not chunks:
         return "No relevant information found in the repository."
@@ -49,7 +54,7 @@ def query_processor(query: str, repo_id: str, top_k: int = 5, progress_callback=
     system_prompt = "You are a code assistant. Answer questions based on provided code snippets. Be concise and include examples when relevant."
     
     try:
-        response = openai_client.chat.completions.create(
+        response = await embedder.get_async_openai().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -65,4 +70,4 @@ def query_processor(query: str, repo_id: str, top_k: int = 5, progress_callback=
 if __name__ == "__main__":
     query="what is this project about" #temporary
     repo_id = repo_processor("https://github.com/samarth-p/College-ERP.git")
-    query_processor(query=query, repo_id=repo_id, top_k=5)
\ No newline at end of file
+    asyncio.run(query_processor(query=query, repo_id=repo_id, top_k=5))
\ No newline at end of file
@@ -0,0 +1,142 @@
+# pipeline.py
+# Streams chunks from parsing straight into embedding and upserting instead
+# of materializing every chunk before the first OpenAI call. Three stages
+# connected by bounded asyncio.Queues for backpressure:
+#
+#   parse (threads) -> parse_q -> embed workers (OpenAI) -> embed_q -> upsert
+#
+# Wall-clock for ingestion drops to roughly max(parse, embed, upsert)
+# instead of their sum, and peak memory stays bounded by the queue sizes.
+import asyncio
+from typing import Dict, List
+
+from chunking import chunker
+from indexing import embedder
+
+PARSE_QUEUE_SIZE = 512
+EMBED_QUEUE_SIZE = 64
+EMBED_WORKERS = 4
+EMBED_BATCH = 100
+UPSERT_BATCH = 100
+
+_SENTINEL = object()
+
+
+async def _parse_producer(entries: List[Dict], parse_q: asyncio.Queue):
+    """Chunk files in worker threads, feeding chunks into parse_q as they land."""
+    for entry in entries:
+        try:
+            chunks = await asyncio.to_thread(chunker.chunk_file_entry, entry)
+        except Exception as e:
+            print(f"[pipeline] chunking failed for {entry.get('path', '<unknown>')}: {e}")
+            continue
+        for ch in chunks:
+            await parse_q.put(ch)
+    for _ in range(EMBED_WORKERS):
+        await parse_q.put(_SENTINEL)
+
+
+async def _embed_batch(batch: List[Dict], embed_q: asyncio.Queue,
+                       index, repo_id: str, sem: asyncio.Semaphore):
+    """Embed one batch through the shared embedder machinery.
+
+    Going through _embed_texts_async rather than a bare embeddings.create
+    gives this path everything embed_chunks already has: the SQLite
+    embedding cache, dedup of identical texts, token-bounded sub-batches,
+    and backoff-with-jitter on rate limits. The content-addressed id
+    prefilter skips chunks the namespace already holds, so re-ingesting
+    only pays for what changed.
+    """
+    ids = [c.get('id', '') for c in batch]
+    existing = await asyncio.to_thread(embedder._fetch_existing_ids, index, ids, repo_id)
+    if existing:
+        batch = [c for c in batch if c.get('id', '') not in existing]
+        if not batch:
+            return
+    texts = [embedder._truncate_for_embedding(c['text'].strip())[0] for c in batch]
+    embeddings, _ = await embedder._embed_texts_async(texts, sem=sem)
+    for chunk, text, embedding in zip(batch, texts, embeddings):
+        await embed_q.put((chunk, text, embedding))
+
+
+async def _embed_worker(parse_q: asyncio.Queue, embed_q: asyncio.Queue,
+                        index, repo_id: str, sem: asyncio.Semaphore):
+    """Pull chunk batches off parse_q, embed them, push (chunk, text, vector)."""
+    batch = []
+    done = False
+    while not done:
+        item = await parse_q.get()
+        if item is _SENTINEL:
+            done = True
+        elif item.get('text', '').strip():
+            batch.append(item)
+        if batch and (done or len(batch) >= EMBED_BATCH):
+            try:
+                await _embed_batch(batch, embed_q, index, repo_id, sem)
+            except Exception as e:
+                print(f"[pipeline] embedding batch failed: {e}")
+            batch = []
+    await embed_q.put(_SENTINEL)
+
+
+async def _upsert_consumer(embed_q: asyncio.Queue, index, repo_id: str):
+    """Drain embedded chunks and upsert them to Pinecone in batches."""
+    vectors = []
+    pending_workers = EMBED_WORKERS
+    total = 0
+
+    async def flush():
+        nonlocal vectors, total
+        if not vectors:
+            return
+        try:
+            await asyncio.to_thread(index.upsert, vectors=vectors, namespace=repo_id)
+            total += len(vectors)
+        except Exception as e:
+            print(f"[pipeline] upsert batch failed: {e}")
+        vectors = []
+
+    while pending_workers:
+        item = await embed_q.get()
+        if item is _SENTINEL:
+            pending_workers -= 1
+            continue
+        chunk, text, embedding = item
+        vectors.append((chunk.get('id', ''), embedding,
+                        embedder.vector_metadata(chunk, text)))
+        if len(vectors) >= UPSERT_BATCH:
+            await flush()
+    await flush()
+    return total
+
+
+async def _run(entries: List[Dict], index_name: str, repo_id: str) -> int:
+    parse_q = asyncio.Queue(maxsize=PARSE_QUEUE_SIZE)
+    embed_q = asyncio.Queue(maxsize=EMBED_QUEUE_SIZE)
+    index = embedder.get_index(index_name)
+    # one semaphore shared by every worker, so OpenAI concurrency stays
+    # bounded at EMBED_CONCURRENCY no matter how many workers batch
+    sem = asyncio.Semaphore(embedder.EMBED_CONCURRENCY)
+    results = await asyncio.gather(
+        _parse_producer(entries, parse_q),
+        *[_embed_worker(parse_q, embed_q, index, repo_id, sem) for _ in range(EMBED_WORKERS)],
+        _upsert_consumer(embed_q, index, repo_id),
+    )
+    return results[-1]
+
+
+def ingest_entries(entries: List[Dict], index_name: str = "code-chunks", repo_id: str = "default") -> int:
+    """Chunk, embed and upsert file entries as one streaming pipeline.
+
+    Args:
+        entries: list of {'path': ..., 'content': ...} dicts from file_reader
+        index_name: Pinecone index name
+        repo_id: namespace for the repository
+
+    Returns:
+        number of vectors upserted
+    """
+    print(f"[pipeline] Ingesting {len(entries)} files into '{index_name}/{repo_id}'...")
+    total = asyncio.run(_run(entries, index_name, repo_id))
+    print(f"[pipeline] ✓ Upserted {total} vectors")
+    return total
@@ -2,4 +2,7 @@
 import sys, os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from chunking import chunker
-print("PARSERS LOADED:", list(chunker.PARSER_BY_LANG.keys()))
+# languages load lazily; force each one so missing wheels show up here
+for lang in sorted(chunker.SUPPORTED_LANGS):
+    chunker.get_parser(lang)
+print("LANGUAGES LOADED:", list(chunker.LANG_CAPSULE_BY_LANG.keys()))
@@ -0,0 +1,60 @@
+# scripts/test_embedding.py
+# Manual end-to-end check of embedding + retrieval against a live Pinecone
+# index (was the __main__ block of indexing/embedder.py). Expects a
+# result.json of chunks in the working directory.
+import sys, os, json, asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from indexing.embedder import embed_chunks, retrieve_chunks
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("STARTING TEST: Embedding and Retrieval")
+    print("="*60 + "\n")
+
+    # Step 1: Load chunks
+    print("[STEP 1] Loading result.json...")
+    try:
+        with open("result.json") as f:
+            chunks = json.load(f)
+        print(f"✓ Loaded {len(chunks)} chunks\n")
+    except Exception as e:
+        print(f"✗ Error loading result.json: {e}")
+        sys.exit(1)
+
+    # Step 2: Embed chunks
+    print("[STEP 2] Embedding chunks with OpenAI...")
+    stats = embed_chunks(chunks, index_name="code-chunks", repo_id="flask")
+    if stats:
+        print(f"\n✓ Embedding successful!")
+        print(f"  - Chunks: {stats['num_embedded']}")
+        print(f"  - Tokens: {stats['total_tokens']}")
+        print(f"  - Index: {stats['index_name']}")
+        print(f"  - Repo: {stats['repo_id']}\n")
+    else:
+        print("✗ Embedding failed")
+        sys.exit(1)
+
+    # Step 3: Test retrieval
+    print("[STEP 3] Testing retrieval with sample queries...")
+    test_queries = [
+        "How do I handle HTTP requests?",
+        "What is the Flask app structure?",
+        "How do I create routes?",
+    ]
+
+    for query in test_queries:
+        print(f"\n  Query: '{query}'")
+        results = asyncio.run(retrieve_chunks(query, index_name="code-chunks", repo_id="flask", top_k=2))
+
+        if results:
+            for idx, result in enumerate(results, 1):
+                meta = result['metadata']
+                score = result['score']
+                print(f"    [{idx}] Score: {score:.3f} | File: {meta.get('file_path', 'N/A')} | Lang: {meta.get('lang', 'N/A')}")
+                print(f"        Text: {meta.get('text', 'N/A')[:100]}...")
+        else:
+            print("    No results found")
+
+    print("\n" + "="*60)
+    print("✓ TEST COMPLETE")
+    print("="*60)